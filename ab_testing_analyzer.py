@@ -1,24 +1,79 @@
 import numpy as np
-import scipy.stats as scipy_stats
-import pandas as pd
-from itertools import combinations
 import json
 import argparse
+import functools
+import math
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+# pandas and scipy are imported on first use so that --help and
+# --create-template do not pay their import time
+
+# Shorter revenue lists are summed in pure Python, which beats building a NumPy array
+NUMPY_MIN_CONVERSIONS = 64
+
+# Larger comparison tables are truncated to their head and tail when printed
+MAX_PRINTED_COMPARISONS = 50
+
+@functools.lru_cache(maxsize=None)
+def _scipy_special():
+    """Import scipy.special (ndtr, ndtri) on first use"""
+    import scipy.special
+    return scipy.special
+
+@functools.lru_cache(maxsize=16)
+def _z_crit(alpha):
+    """Two-sided critical value of the standard normal distribution for significance level alpha"""
+    return float(_scipy_special().ndtri(1 - alpha/2))
+
+def _pairwise_ztest(metric_arr, se_arr, i_idx, j_idx):
+    """
+    Two-sided z-tests for the differences metric[i] - metric[j] over all index pairs
+    :param metric_arr: Array of group metric values
+    :param se_arr: Array of group standard errors
+    :param i_idx: Array of first group indices
+    :param j_idx: Array of second group indices
+    :return: Tuple of (difference, difference standard error, z-score, p-value) arrays
+    """
+    diff = metric_arr[i_idx] - metric_arr[j_idx]
+    se_diff = np.hypot(se_arr[i_idx], se_arr[j_idx])
+    
+    # z = 0 where the standard error is 0
+    z_score = np.divide(diff, se_diff, out=np.zeros_like(diff), where=se_diff > 0)
+    p_value = 2.0 * _scipy_special().ndtr(-np.abs(z_score))
+    return diff, se_diff, z_score, p_value
+
 def calculate_group_stats(users, conversions, alpha=0.05):
     """
     Calculate statistical metrics for a single group
     :param users: Total number of users
-    :param conversions: List of conversion user revenues, e.g., [39.99, 49.99, 39.99]
+    :param conversions: List of conversion user revenues, e.g., [39.99, 49.99, 39.99],
+                        or aggregated revenues {'n': count, 's': sum, 'ss': sum of squares}
     :param alpha: Significance level for confidence intervals
     :return: Dictionary containing statistical metrics
     """
     # Calculate basic metrics
-    conversions = np.array(conversions)
-    n_conversions = len(conversions)
-    total_revenue = np.sum(conversions) if n_conversions > 0 else 0
+    if isinstance(conversions, dict):
+        n_conversions = conversions['n']
+        total_revenue = conversions['s'] if n_conversions > 0 else 0
+        sum_sq_revenue = conversions['ss']
+    elif isinstance(conversions, list) and len(conversions) < NUMPY_MIN_CONVERSIONS:
+        n_conversions = len(conversions)
+        total_revenue = math.fsum(conversions) if n_conversions > 0 else 0
+        sum_sq_revenue = math.fsum(x * x for x in conversions)
+    else:
+        conversions = np.array(conversions, dtype=float)
+        n_conversions = len(conversions)
+        total_revenue = np.sum(conversions) if n_conversions > 0 else 0
+        sum_sq_revenue = float(np.dot(conversions, conversions))
+    
+    if n_conversions > users:
+        raise ValueError("Conversions cannot exceed users")
     
     # ARPU calculation
     arpu = total_revenue / users if users > 0 else 0
@@ -29,12 +84,17 @@ def calculate_group_stats(users, conversions, alpha=0.05):
     
     # Calculate revenue variance (considering different prices for conversion users)
     if n_conversions > 0:
-        # Create complete revenue array (including 0 revenue for non-converted users)
-        all_revenues = np.zeros(users)
-        all_revenues[:n_conversions] = conversions
+        # Non-converted users contribute 0 revenue, so the sum of squared deviations
+        # splits into the spread among conversions plus the gap between their mean
+        # and the zeros. The first term is clamped: it is exactly 0 for uniform
+        # prices, but floating-point cancellation can leave it slightly negative.
+        s = total_revenue
+        ss = sum_sq_revenue
+        within_ss = max(0.0, ss - s*s/n_conversions)
+        between_ss = s*s/n_conversions * (users - n_conversions) / users
         
         # Calculate sample variance (unbiased estimate)
-        revenue_variance = np.var(all_revenues, ddof=1)
+        revenue_variance = (within_ss + between_ss) / (users - 1) if users > 1 else 0.0
     else:
         revenue_variance = 0
     
@@ -42,7 +102,7 @@ def calculate_group_stats(users, conversions, alpha=0.05):
     se = np.sqrt(revenue_variance / users) if users > 0 else 0
     
     # Calculate confidence intervals
-    z_critical = scipy_stats.norm.ppf(1 - alpha/2)
+    z_critical = _z_crit(alpha)
     arpu_ci_lower = arpu - z_critical * se
     arpu_ci_upper = arpu + z_critical * se
     
@@ -67,26 +127,39 @@ def calculate_conversion_rate_stats(users, conversions, alpha=0.05):
     :param alpha: Significance level for confidence intervals
     :return: Dictionary containing conversion rate statistics
     """
-    if not isinstance(conversions, int) or conversions < 0:
-        raise ValueError("Conversions must be a non-negative integer")
+    columns = calculate_conversion_rate_columns([users], [conversions], alpha)
+    return {key: values[0].item() for key, values in columns.items()}
+
+def calculate_conversion_rate_columns(users, conversions, alpha=0.05):
+    """
+    Calculate conversion rate statistics for several groups at once
+    :param users: Sequence of total numbers of users, one per group
+    :param conversions: Sequence of numbers of conversions (integers), one per group
+    :param alpha: Significance level for confidence intervals
+    :return: Dictionary mapping each statistic to an array with one value per group
+    """
+    for n_conversions in conversions:
+        if not isinstance(n_conversions, int) or n_conversions < 0:
+            raise ValueError("Conversions must be a non-negative integer")
     
-    # Calculate conversion rate
-    conversion_rate = conversions / users if users > 0 else 0
+    # Users keep the type they were given, as in the per-group calculation
+    users = np.asarray(users)
+    conversions = np.asarray(conversions, dtype=np.int64)
     
-    # Calculate standard error using binomial approximation
-    if users > 0 and conversion_rate > 0 and conversion_rate < 1:
-        se = np.sqrt(conversion_rate * (1 - conversion_rate) / users)
-    else:
-        se = 0
+    # Calculate conversion rates
+    conversion_rate = np.divide(conversions, users, out=np.zeros(len(users)), where=users > 0)
     
-    # Calculate confidence intervals using normal approximation
-    z_critical = scipy_stats.norm.ppf(1 - alpha/2)
-    rate_ci_lower = conversion_rate - z_critical * se
-    rate_ci_upper = conversion_rate + z_critical * se
+    # Calculate standard errors using binomial approximation
+    has_variance = (users > 0) & (conversion_rate > 0) & (conversion_rate < 1)
+    rate_variance = np.divide(conversion_rate * (1 - conversion_rate), users,
+                              out=np.zeros(len(users)), where=has_variance)
+    se = np.sqrt(rate_variance)
     
-    # Ensure confidence intervals are within [0, 1] for conversion rates
-    rate_ci_lower = max(0, rate_ci_lower)
-    rate_ci_upper = min(1, rate_ci_upper)
+    # Calculate confidence intervals using normal approximation,
+    # clipped to [0, 1] for conversion rates
+    z_critical = _z_crit(alpha)
+    rate_ci_lower = np.clip(conversion_rate - z_critical * se, 0.0, 1.0)
+    rate_ci_upper = np.clip(conversion_rate + z_critical * se, 0.0, 1.0)
     
     return {
         'users': users,
@@ -97,14 +170,87 @@ def calculate_conversion_rate_stats(users, conversions, alpha=0.05):
         'se': se
     }
 
+def _to_columns(records):
+    """
+    Convert per-group statistics dictionaries into column arrays (one array per metric)
+    :param records: List of dictionaries sharing the same keys
+    :return: Dictionary mapping each key to a NumPy array; non-numeric columns such as
+             group names are kept as object arrays so their values are not converted to strings
+    """
+    if not records:
+        return {}
+    columns = {}
+    for key in records[0]:
+        values = [record[key] for record in records]
+        column = np.array(values)
+        if column.dtype.kind not in 'biuf':
+            column = np.array(values, dtype=object)
+        columns[key] = column
+    return columns
+
+def _compare_groups_ztest(metric_arr, se_arr, name_arr, alpha, labels):
+    """
+    Perform pairwise z-tests between all groups with Bonferroni correction
+    :param metric_arr: Array of group metric values (ARPU or conversion rate)
+    :param se_arr: Array of group standard errors
+    :param name_arr: Array of group names
+    :param alpha: Significance level
+    :param labels: Column names for the metric, {'A': ..., 'B': ..., 'diff': ...}
+    :return: DataFrame with comparison results
+    """
+    import pandas as pd
+    
+    columns = ['Group A', 'Group B', labels['A'], labels['B'], labels['diff'],
+               'Diff CI Lower', 'Diff CI Upper', 'SE Difference', 'Z-score', 'P-value', 'Significant']
+    
+    n_groups = len(metric_arr)
+    if n_groups < 2:
+        # Nothing to compare
+        return pd.DataFrame(columns=columns).astype({'Significant': bool})
+    
+    n_comparisons = n_groups * (n_groups - 1) // 2
+    
+    # Bonferroni correction for multiple comparisons
+    bonferroni_alpha = alpha / n_comparisons
+    
+    # Critical value for the difference confidence intervals
+    z_critical = _z_crit(alpha)
+    
+    # Upper-triangle index pairs (i < j), one per pairwise comparison
+    i_idx, j_idx = np.triu_indices(n_groups, k=1)
+    
+    # Calculate differences, their standard errors, z-statistics and p-values
+    diff, se_diff, z_score, p_value = _pairwise_ztest(metric_arr, se_arr, i_idx, j_idx)
+    
+    # Calculate confidence intervals for the differences
+    diff_ci_lower = diff - z_critical * se_diff
+    diff_ci_upper = diff + z_critical * se_diff
+    
+    return pd.DataFrame(dict(zip(columns, [
+        name_arr[i_idx],
+        name_arr[j_idx],
+        metric_arr[i_idx],
+        metric_arr[j_idx],
+        diff,
+        diff_ci_lower,
+        diff_ci_upper,
+        se_diff,
+        z_score,
+        p_value,
+        p_value < bonferroni_alpha
+    ])))
+
 def compare_groups_arpu(groups, alpha=0.05, group_names=None):
     """
     Compare multiple experimental groups and perform ARPU statistical tests
     :param groups: List of group data, each element is a tuple of (users, conversion_revenue_list)
+                   or (users, aggregated_revenues), see calculate_group_stats
     :param alpha: Significance level
     :param group_names: List of group names (optional)
     :return: DataFrame with comparison results
     """
+    import pandas as pd
+    
     # Calculate statistics for each group
     group_data = []
     for i, (users, conv_list) in enumerate(groups):
@@ -112,54 +258,28 @@ def compare_groups_arpu(groups, alpha=0.05, group_names=None):
         stats_dict['group'] = group_names[i] if group_names else f'Group {i}'
         group_data.append(stats_dict)
     
-    # Create results DataFrame
-    results_df = pd.DataFrame(group_data)
+    labels = {'A': 'ARPUA', 'B': 'ARPUB', 'diff': 'ARPU Difference'}
+    if not group_data:
+        # No groups: no statistics and nothing to compare
+        empty = np.empty(0)
+        return pd.DataFrame(), _compare_groups_ztest(empty, empty, empty.astype(object), alpha, labels)
+    
+    # Keep per-group statistics as parallel arrays for the numerical pipeline
+    group_columns = _to_columns(group_data)
     
     # Perform pairwise comparisons
-    comparisons = []
-    n_groups = len(results_df)
-    n_comparisons = n_groups * (n_groups - 1) // 2
+    comparisons = _compare_groups_ztest(
+        group_columns['arpu'].astype(float, copy=False),
+        group_columns['se'].astype(float, copy=False),
+        group_columns['group'],
+        alpha,
+        labels
+    )
     
-    # Bonferroni correction for multiple comparisons
-    bonferroni_alpha = alpha / n_comparisons if n_comparisons > 0 else alpha
+    # Create results DataFrame
+    results_df = pd.DataFrame(group_columns)
     
-    for (i, j) in combinations(results_df.index, 2):
-        group_i = results_df.loc[i]
-        group_j = results_df.loc[j]
-        
-        # Calculate ARPU difference
-        arpu_diff = group_i['arpu'] - group_j['arpu']
-        
-        # Calculate difference standard error
-        se_diff = np.sqrt(group_i['se']**2 + group_j['se']**2)
-        
-        # Calculate z-statistic and p-value
-        z_score = arpu_diff / se_diff if se_diff > 0 else 0
-        p_value = 2 * (1 - scipy_stats.norm.cdf(abs(z_score)))
-        
-        # Calculate confidence interval for the difference
-        z_critical = scipy_stats.norm.ppf(1 - alpha/2)
-        diff_ci_lower = arpu_diff - z_critical * se_diff
-        diff_ci_upper = arpu_diff + z_critical * se_diff
-        
-        # Determine significance
-        significant = p_value < bonferroni_alpha
-        
-        comparisons.append({
-            'Group A': group_i['group'],
-            'Group B': group_j['group'],
-            'ARPUA': group_i['arpu'],
-            'ARPUB': group_j['arpu'],
-            'ARPU Difference': arpu_diff,
-            'Diff CI Lower': diff_ci_lower,
-            'Diff CI Upper': diff_ci_upper,
-            'SE Difference': se_diff,
-            'Z-score': z_score,
-            'P-value': p_value,
-            'Significant': significant
-        })
-    
-    return results_df, pd.DataFrame(comparisons)
+    return results_df, comparisons
 
 def compare_groups_conversion_rate(groups, alpha=0.05, group_names=None):
     """
@@ -169,61 +289,29 @@ def compare_groups_conversion_rate(groups, alpha=0.05, group_names=None):
     :param group_names: List of group names (optional)
     :return: DataFrame with comparison results
     """
-    # Calculate statistics for each group
-    group_data = []
-    for i, (users, conversions) in enumerate(groups):
-        stats_dict = calculate_conversion_rate_stats(users, conversions, alpha)
-        stats_dict['group'] = group_names[i] if group_names else f'Group {i}'
-        group_data.append(stats_dict)
+    import pandas as pd
     
-    # Create results DataFrame
-    results_df = pd.DataFrame(group_data)
+    # Calculate statistics for all groups at once, as parallel arrays
+    group_columns = calculate_conversion_rate_columns(
+        [users for users, _ in groups], [conversions for _, conversions in groups], alpha
+    )
+    group_columns['group'] = np.array(
+        [group_names[i] if group_names else f'Group {i}' for i in range(len(groups))], dtype=object
+    )
     
     # Perform pairwise comparisons
-    comparisons = []
-    n_groups = len(results_df)
-    n_comparisons = n_groups * (n_groups - 1) // 2
+    comparisons = _compare_groups_ztest(
+        group_columns['conversion_rate'],
+        group_columns['se'],
+        group_columns['group'],
+        alpha,
+        {'A': 'Rate A', 'B': 'Rate B', 'diff': 'Rate Difference'}
+    )
     
-    # Bonferroni correction for multiple comparisons
-    bonferroni_alpha = alpha / n_comparisons if n_comparisons > 0 else alpha
+    # Create results DataFrame
+    results_df = pd.DataFrame(group_columns)
     
-    for (i, j) in combinations(results_df.index, 2):
-        group_i = results_df.loc[i]
-        group_j = results_df.loc[j]
-        
-        # Calculate conversion rate difference
-        rate_diff = group_i['conversion_rate'] - group_j['conversion_rate']
-        
-        # Calculate difference standard error
-        se_diff = np.sqrt(group_i['se']**2 + group_j['se']**2)
-        
-        # Calculate z-statistic and p-value
-        z_score = rate_diff / se_diff if se_diff > 0 else 0
-        p_value = 2 * (1 - scipy_stats.norm.cdf(abs(z_score)))
-        
-        # Calculate confidence interval for the difference
-        z_critical = scipy_stats.norm.ppf(1 - alpha/2)
-        diff_ci_lower = rate_diff - z_critical * se_diff
-        diff_ci_upper = rate_diff + z_critical * se_diff
-        
-        # Determine significance
-        significant = p_value < bonferroni_alpha
-        
-        comparisons.append({
-            'Group A': group_i['group'],
-            'Group B': group_j['group'],
-            'Rate A': group_i['conversion_rate'],
-            'Rate B': group_j['conversion_rate'],
-            'Rate Difference': rate_diff,
-            'Diff CI Lower': diff_ci_lower,
-            'Diff CI Upper': diff_ci_upper,
-            'SE Difference': se_diff,
-            'Z-score': z_score,
-            'P-value': p_value,
-            'Significant': significant
-        })
-    
-    return results_df, pd.DataFrame(comparisons)
+    return results_df, comparisons
 
 def compare_groups(groups, alpha=0.05, analysis_type='arpu', group_names=None):
     """
@@ -253,8 +341,11 @@ def load_data_from_json(json_file_path):
     :return: List of groups data and analysis type
     """
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        if orjson is not None:
+            data = orjson.loads(Path(json_file_path).read_bytes())
+        else:
+            with open(json_file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
         
         # Validate JSON structure
         if not isinstance(data, dict):
@@ -289,7 +380,8 @@ def load_data_from_json(json_file_path):
                 raise ValueError(f"Group {i} users must be a positive integer")
             
             if analysis_type == 'arpu':
-                conversions = []
+                # Revenues are kept as sufficient statistics: count, sum and sum of squares
+                conversions = {'n': 0, 's': 0.0, 'ss': 0.0}
                 
                 # Format 1: Aggregated format
                 if 'total_revenue' in group_data and 'conversion_count' in group_data:
@@ -303,9 +395,11 @@ def load_data_from_json(json_file_path):
                     
                     if conversion_count > 0:
                         avg_price = total_revenue / conversion_count
-                        conversions = [avg_price] * conversion_count
-                    else:
-                        conversions = []
+                        conversions = {
+                            'n': conversion_count,
+                            's': float(total_revenue),
+                            'ss': total_revenue * avg_price
+                        }
                 
                 # Format 2: Price counts format
                 elif 'price_counts' in group_data:
@@ -328,11 +422,16 @@ def load_data_from_json(json_file_path):
                         if not isinstance(count, int) or count < 0:
                             raise ValueError(f"Group {i} price_count {j} count must be a non-negative integer")
                         
-                        conversions.extend([price] * count)
+                        conversions['n'] += count
+                        conversions['s'] += price * count
+                        conversions['ss'] += price * price * count
                 
                 else:
                     raise ValueError(f"Group {i} must contain either 'price_counts' or both 'total_revenue' and 'conversion_count'")
                 
+                if conversions['n'] > users:
+                    raise ValueError(f"Group {i} conversions cannot exceed users")
+                
                 groups.append((users, conversions))
             
             else:  # conversion_rate analysis
@@ -493,6 +592,16 @@ def input_conversion_rate_data():
     
     return groups
 
+def _to_records(df):
+    """
+    Convert a DataFrame into a list of row dictionaries holding native Python values
+    :param df: DataFrame to convert
+    :return: List of dictionaries, one per row
+    """
+    columns = list(df.columns)
+    arrays = [df[column].to_numpy().tolist() for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*arrays)]
+
 def save_results_to_json(group_results, comparison_results, output_file, analysis_type='arpu', alpha=0.05):
     """
     Save analysis results to JSON file
@@ -504,28 +613,33 @@ def save_results_to_json(group_results, comparison_results, output_file, analysi
     """
     if analysis_type == 'arpu':
         best_metric = 'arpu'
-        best_value = float(group_results['arpu'].max())
         metric_name = 'best_arpu'
     else:
         best_metric = 'conversion_rate'
-        best_value = float(group_results['conversion_rate'].max())
         metric_name = 'best_conversion_rate'
     
+    metric_arr = group_results[best_metric].to_numpy()
+    best_idx = int(np.argmax(metric_arr))
+    
     results = {
         'analysis_type': analysis_type,
         'confidence_level': f'{(1-alpha)*100:.0f}%',
-        'group_statistics': group_results.to_dict('records'),
-        'comparisons': comparison_results.to_dict('records'),
+        'group_statistics': _to_records(group_results),
+        'comparisons': _to_records(comparison_results),
         'summary': {
             'total_groups': len(group_results),
-            'best_group': group_results.loc[group_results[best_metric].idxmax()]['group'],
-            metric_name: best_value,
-            'significant_comparisons': int(comparison_results['Significant'].sum())
+            'best_group': group_results['group'].to_numpy()[best_idx],
+            metric_name: float(metric_arr[best_idx]),
+            'significant_comparisons': int(np.count_nonzero(comparison_results['Significant'].to_numpy()))
         }
     }
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, default=str)
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2, default=str))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, default=str)
     
     print(f"Results saved to: {output_file}")
 
@@ -628,6 +742,8 @@ Examples:
         
         alpha = args.alpha
     
+    import pandas as pd
+    
     # Perform analysis
     group_results, comparison_results = compare_groups(groups, alpha, analysis_type, group_names)
     
@@ -646,7 +762,14 @@ Examples:
     pd.set_option('display.float_format', '{:.4f}'.format)
     pd.set_option('display.max_columns', None)
     pd.set_option('display.width', None)
-    print(comparison_results)
+    if len(comparison_results) > MAX_PRINTED_COMPARISONS:
+        # Only format the head and tail of large tables
+        print(comparison_results.to_string(max_rows=MAX_PRINTED_COMPARISONS, float_format='{:.4f}'.format,
+                                           show_dimensions=True))
+        if not args.output:
+            print("Use --output to save all comparisons to a JSON file")
+    else:
+        print(comparison_results)
     
     print("\n" + "="*80)
     print("Experiment Conclusions:")
@@ -672,11 +795,14 @@ Examples:
         print("Conclusion: No statistically significant winner (all group differences are not significant)")
     else:
         winners = set()
-        for _, row in significant_comparisons.iterrows():
-            if row[diff_column] > 0:
-                winners.add(row['Group A'])
+        group_a_arr = significant_comparisons['Group A'].to_numpy()
+        group_b_arr = significant_comparisons['Group B'].to_numpy()
+        diff_arr = significant_comparisons[diff_column].to_numpy()
+        for group_a, group_b, diff in zip(group_a_arr, group_b_arr, diff_arr):
+            if diff > 0:
+                winners.add(group_a)
             else:
-                winners.add(row['Group B'])
+                winners.add(group_b)
         
         if len(winners) == 1:
             winner = next(iter(winners))
@@ -4,11 +4,183 @@ Sample Size Calculator for A/B Testing
 Calculates required sample sizes for conversion rate and ARPU tests
 """
 
-import numpy as np
-from scipy.stats import norm, t
+from __future__ import annotations
+
 import json
 from pathlib import Path
 import argparse
+import functools
+import math
+import sys
+from typing import TYPE_CHECKING
+
+# numpy and scipy are imported where they are needed so that the CLI starts quickly
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+# Use the numba grid kernel only for grids large enough to amortize loading it
+NUMBA_MIN_GRID_CELLS = 20_000_000
+
+
+def _json_default(obj):
+    """Serialize NumPy values as JSON numbers/lists and anything else as a string"""
+    import numpy as np
+    
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    return str(obj)
+
+
+@functools.lru_cache(maxsize=16)
+def _allocation_factors(allocation_ratio: float) -> tuple:
+    """
+    Allocation-dependent factors, cached per allocation ratio
+    
+    Args:
+        allocation_ratio (float): Ratio of users in treatment group
+        
+    Returns:
+        tuple: (1 + 1/allocation_ratio, 1 - allocation_ratio)
+    """
+    return 1 + 1/allocation_ratio, 1 - allocation_ratio
+
+
+# (z_alpha, z_beta) for common (confidence_level, power) settings, as computed by norm.ppf
+_Z_TABLE = {
+    (0.90, 0.80): (1.6448536269514722, 0.8416212335729143),
+    (0.90, 0.90): (1.6448536269514722, 1.2815515655446004),
+    (0.95, 0.80): (1.959963984540054, 0.8416212335729143),
+    (0.95, 0.90): (1.959963984540054, 1.2815515655446004),
+    (0.99, 0.80): (2.5758293035489004, 0.8416212335729143),
+    (0.99, 0.90): (2.5758293035489004, 1.2815515655446004),
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _z_critical(confidence_level: float, power: float) -> tuple:
+    """
+    Critical values for a two-tailed test, cached per (confidence_level, power)
+    
+    Common settings are looked up in _Z_TABLE without importing scipy.
+    
+    Args:
+        confidence_level (float): Confidence level (e.g., 0.95 for 95%)
+        power (float): Statistical power (e.g., 0.80 for 80%)
+        
+    Returns:
+        tuple: (z_alpha, z_beta)
+    """
+    z_values = _Z_TABLE.get((confidence_level, power))
+    if z_values is not None:
+        return z_values
+    
+    from scipy.stats import norm
+    
+    alpha = 1 - confidence_level
+    beta = 1 - power
+    return float(norm.ppf(1 - alpha / 2)), float(norm.ppf(1 - beta))
+
+
+@functools.lru_cache(maxsize=16)
+def make_calculator(confidence_level: float = 0.95, power: float = 0.80, allocation_ratio: float = 0.5):
+    """
+    Build a conversion rate sample size function specialized to fixed test settings
+    
+    The critical values and allocation factor are computed once and bound into the
+    returned closure, which is cached per (confidence_level, power, allocation_ratio).
+    The rates come from SampleSizeCalculator._core. Inputs are not validated.
+    
+    Args:
+        confidence_level (float): Confidence level (e.g., 0.95 for 95%)
+        power (float): Statistical power (e.g., 0.80 for 80%)
+        allocation_ratio (float): Ratio of users in treatment group
+        
+    Returns:
+        Function mapping (control_rate, lift_percentage) to the total sample size
+    """
+    z_alpha, z_beta = _z_critical(confidence_level, power)
+    z2 = (z_alpha + z_beta) ** 2
+    allocation_factor, _ = _allocation_factors(allocation_ratio)
+    core = SampleSizeCalculator._core
+    ceil = math.ceil
+    
+    def calculate(control_rate: float, lift_percentage: float) -> int:
+        _, pooled_variance, effect_size = core(control_rate, lift_percentage)
+        return ceil(z2 * pooled_variance * allocation_factor / effect_size ** 2)
+    
+    return calculate
+
+
+def _phi(z: float) -> float:
+    """Standard normal CDF, computed with math.erfc (accurate in both tails)"""
+    return 0.5 * math.erfc(-z / math.sqrt(2))
+
+
+@functools.lru_cache(maxsize=None)
+def _ss_grid_numba():
+    """
+    Compile the numba kernel for _ss_grid on first use
+    
+    Returns:
+        Kernel function parallelized over the control rates (compiled once and cached
+        on disk), or None if numba is not installed
+    """
+    try:
+        import numba as nb
+    except ImportError:  # numba is optional
+        return None
+    import numpy as np
+    
+    core = nb.njit(cache=True)(SampleSizeCalculator._core)
+    
+    @nb.njit(parallel=True, cache=True)
+    def kernel(control_rates, lifts, z2, allocation_factor):
+        out = np.empty((control_rates.shape[0], lifts.shape[0]), dtype=np.int64)
+        for i in nb.prange(control_rates.shape[0]):
+            for j in range(lifts.shape[0]):
+                _, pooled_variance, effect_size = core(control_rates[i], lifts[j])
+                numerator = z2 * pooled_variance * allocation_factor
+                denominator = effect_size ** 2
+                out[i, j] = math.ceil(numerator / denominator)
+        return out
+    
+    return kernel
+
+
+def _ss_grid(control_rates: np.ndarray, lifts: np.ndarray, z2: float, allocation_ratio: float) -> np.ndarray:
+    """
+    Total sample sizes for every (control rate, lift) combination
+    
+    Args:
+        control_rates (np.ndarray): Baseline conversion rates
+        lifts (np.ndarray): Expected lifts
+        z2 (float): Squared sum of the critical values, (z_alpha + z_beta) ** 2
+        allocation_ratio (float): Ratio of users in treatment group
+        
+    Returns:
+        np.ndarray: int64 matrix of shape (len(control_rates), len(lifts))
+    """
+    import numpy as np
+    
+    allocation_factor, _ = _allocation_factors(allocation_ratio)
+    
+    if len(control_rates) * len(lifts) >= NUMBA_MIN_GRID_CELLS:
+        kernel = _ss_grid_numba()
+        if kernel is not None:
+            return kernel(control_rates, lifts, z2, allocation_factor)
+    
+    _, pooled_variance, effect_size = SampleSizeCalculator._core(
+        control_rates[:, np.newaxis], lifts[np.newaxis, :]
+    )
+    numerator = z2 * pooled_variance * allocation_factor
+    denominator = effect_size ** 2
+    return np.ceil(numerator / denominator).astype(np.int64)
+
 
 class SampleSizeCalculator:
     def __init__(self, confidence_level: float = 0.95, power: float = 0.80):
@@ -24,9 +196,8 @@ class SampleSizeCalculator:
         self.alpha = 1 - confidence_level
         self.beta = 1 - power
         
-        # Critical values
-        self.z_alpha = norm.ppf(1 - self.alpha / 2)  # Two-tailed test
-        self.z_beta = norm.ppf(1 - self.beta)
+        # Critical values (two-tailed test)
+        self.z_alpha, self.z_beta = _z_critical(confidence_level, power)
         self.z_alpha_plus_beta = self.z_alpha + self.z_beta
     
     def calculate_conversion_rate_sample_size(self, 
@@ -44,51 +215,9 @@ class SampleSizeCalculator:
         Returns:
             dict: Sample size results
         """
-        if not (0 < control_rate < 1):
-            raise ValueError("Control rate must be between 0 and 1")
-        
-        if lift_percentage <= 0:
-            raise ValueError("Lift percentage must be positive")
-        
-        if not (0 < allocation_ratio < 1):
-            raise ValueError("Allocation ratio must be between 0 and 1")
-        
-        # Calculate treatment rate
-        treatment_rate = control_rate * (1 + lift_percentage)
-        
-        # Pooled standard error
-        pooled_rate = (control_rate + treatment_rate) / 2
-        pooled_variance = pooled_rate * (1 - pooled_rate)
+        self._validate(control_rate, lift_percentage, allocation_ratio)
         
-        # Sample size formula for two-proportion z-test
-        numerator = (self.z_alpha_plus_beta ** 2) * pooled_variance * (1 + 1/allocation_ratio)
-        denominator = (treatment_rate - control_rate) ** 2
-        
-        total_sample_size = int(np.ceil(numerator / denominator))
-        
-        # Calculate group sizes
-        control_size = int(total_sample_size * (1 - allocation_ratio))
-        treatment_size = total_sample_size - control_size
-        
-        # Calculate expected conversions
-        expected_control_conversions = int(control_size * control_rate)
-        expected_treatment_conversions = int(treatment_size * treatment_rate)
-        
-        return {
-            'test_type': 'conversion_rate',
-            'control_rate': control_rate,
-            'treatment_rate': treatment_rate,
-            'lift_percentage': lift_percentage,
-            'confidence_level': self.confidence_level,
-            'power': self.power,
-            'allocation_ratio': allocation_ratio,
-            'total_sample_size': total_sample_size,
-            'control_size': control_size,
-            'treatment_size': treatment_size,
-            'expected_control_conversions': expected_control_conversions,
-            'expected_treatment_conversions': expected_treatment_conversions,
-            'minimum_detectable_effect': treatment_rate - control_rate
-        }
+        return self._compute_n(control_rate, lift_percentage, allocation_ratio)
     
     def calculate_arpu_sample_size(self,
                                  control_arpu: float,
@@ -107,39 +236,123 @@ class SampleSizeCalculator:
         Returns:
             dict: Sample size results
         """
-        if control_arpu <= 0:
+        self._validate(control_arpu, lift_percentage, allocation_ratio, price)
+        
+        # Calculate treatment ARPU
+        treatment_arpu = control_arpu * (1 + lift_percentage)
+        
+        # Calculate conversion rates
+        control_conversion_rate = control_arpu / price
+        treatment_conversion_rate = treatment_arpu / price
+        
+        # Conversion rate sample size, extended for ARPU context
+        results = self._compute_n(control_conversion_rate, lift_percentage, allocation_ratio, 'arpu')
+        results['control_arpu'] = control_arpu
+        results['treatment_arpu'] = treatment_arpu
+        results['price'] = price
+        results['control_conversion_rate'] = control_conversion_rate
+        results['treatment_conversion_rate'] = treatment_conversion_rate
+        
+        return results
+    
+    @staticmethod
+    def _validate(control_value: float,
+                  lift_percentage: float,
+                  allocation_ratio: float,
+                  price: float = None):
+        """
+        Validate sample size inputs, raising ValueError on the first invalid one
+        
+        Args:
+            control_value (float): Control conversion rate, or control ARPU when price is given
+            lift_percentage (float): Expected lift as percentage (the smallest lift for tables)
+            allocation_ratio (float): Ratio of users in treatment group
+            price (float): Price per conversion (ARPU tests only)
+        """
+        if price is None:
+            if not (0 < control_value < 1):
+                raise ValueError("Control rate must be between 0 and 1")
+        elif control_value <= 0:
             raise ValueError("Control ARPU must be positive")
         
         if lift_percentage <= 0:
             raise ValueError("Lift percentage must be positive")
         
-        if price <= 0:
+        if price is not None and price <= 0:
             raise ValueError("Price must be positive")
         
         if not (0 < allocation_ratio < 1):
             raise ValueError("Allocation ratio must be between 0 and 1")
         
-        # Calculate treatment ARPU
-        treatment_arpu = control_arpu * (1 + lift_percentage)
+        if price is not None and not (0 < control_value / price < 1):
+            raise ValueError("Control rate must be between 0 and 1")
+    
+    @staticmethod
+    def _validate_rates(control_rate: float, treatment_rate: float):
+        """
+        Validate the conversion rates of a power analysis, raising ValueError if either is out of range
         
-        # Calculate conversion rates
-        control_conversion_rate = control_arpu / price
-        treatment_conversion_rate = treatment_arpu / price
+        Args:
+            control_rate (float): Baseline conversion rate
+            treatment_rate (float): Treatment conversion rate implied by the lift
+        """
+        if not (0 < control_rate < 1):
+            raise ValueError("Control rate must be between 0 and 1")
         
-        # Use conversion rate sample size calculation
-        conversion_results = self.calculate_conversion_rate_sample_size(
-            control_conversion_rate, lift_percentage, allocation_ratio
-        )
+        if not (0 <= treatment_rate <= 1):
+            raise ValueError("Treatment rate must be between 0 and 1")
+    
+    def _compute_n(self,
+                   control_rate: float,
+                   lift_percentage: float,
+                   allocation_ratio: float,
+                   test_type: str = 'conversion_rate') -> dict:
+        """
+        Sample size for a two-proportion z-test on validated inputs
+        
+        Args:
+            control_rate (float): Baseline conversion rate
+            lift_percentage (float): Expected lift as percentage
+            allocation_ratio (float): Ratio of users in treatment group
+            test_type (str): Test type recorded in the results
+            
+        Returns:
+            dict: Sample size results
+        """
+        allocation_factor, control_share = _allocation_factors(allocation_ratio)
+        
+        # Treatment rate, pooled variance and effect size
+        treatment_rate, pooled_variance, effect_size = self._core(control_rate, lift_percentage)
+        
+        # Sample size formula for two-proportion z-test
+        numerator = (self.z_alpha_plus_beta ** 2) * pooled_variance * allocation_factor
+        denominator = effect_size ** 2
+        
+        total_sample_size = math.ceil(numerator / denominator)
         
-        # Update results for ARPU context
-        conversion_results['test_type'] = 'arpu'
-        conversion_results['control_arpu'] = control_arpu
-        conversion_results['treatment_arpu'] = treatment_arpu
-        conversion_results['price'] = price
-        conversion_results['control_conversion_rate'] = control_conversion_rate
-        conversion_results['treatment_conversion_rate'] = treatment_conversion_rate
+        # Calculate group sizes
+        control_size = int(total_sample_size * control_share)
+        treatment_size = total_sample_size - control_size
+        
+        # Calculate expected conversions
+        expected_control_conversions = int(control_size * control_rate)
+        expected_treatment_conversions = int(treatment_size * treatment_rate)
         
-        return conversion_results
+        return {
+            'test_type': test_type,
+            'control_rate': control_rate,
+            'treatment_rate': treatment_rate,
+            'lift_percentage': lift_percentage,
+            'confidence_level': self.confidence_level,
+            'power': self.power,
+            'allocation_ratio': allocation_ratio,
+            'total_sample_size': total_sample_size,
+            'control_size': control_size,
+            'treatment_size': treatment_size,
+            'expected_control_conversions': expected_control_conversions,
+            'expected_treatment_conversions': expected_treatment_conversions,
+            'minimum_detectable_effect': effect_size
+        }
     
     def calculate_power_analysis(self, 
                                test_type: str,
@@ -164,25 +377,10 @@ class SampleSizeCalculator:
         """
         if test_type == 'conversion_rate':
             control_rate = control_value
-            treatment_rate = control_rate * (1 + lift_percentage)
-            
-            # Pooled standard error
-            pooled_rate = (control_rate + treatment_rate) / 2
-            pooled_variance = pooled_rate * (1 - pooled_rate)
-            
-            # Calculate effect size
-            effect_size = treatment_rate - control_rate
-            
-            # Calculate standard error
-            n1 = int(sample_size * (1 - allocation_ratio))
-            n2 = sample_size - n1
-            se = np.sqrt(pooled_variance * (1/n1 + 1/n2))
+            treatment_rate, pooled_variance, effect_size = self._core(control_rate, lift_percentage)
+            self._validate_rates(control_rate, treatment_rate)
             
-            # Calculate z-score for power
-            z_power = (effect_size / se) - self.z_alpha
-            
-            # Calculate power
-            power = norm.cdf(z_power)
+            power, se = self._power(pooled_variance, effect_size, sample_size, allocation_ratio)
             
             return {
                 'test_type': 'conversion_rate',
@@ -204,21 +402,76 @@ class SampleSizeCalculator:
             
             # Convert to conversion rates
             control_rate = control_arpu / price
-            treatment_rate = treatment_arpu / price
+            treatment_rate, pooled_variance, effect_size = self._core(control_rate, lift_percentage)
+            self._validate_rates(control_rate, treatment_rate)
             
-            # Use conversion rate power analysis
-            conversion_results = self.calculate_power_analysis(
-                'conversion_rate', control_rate, lift_percentage, 
-                sample_size, allocation_ratio
-            )
+            power, se = self._power(pooled_variance, effect_size, sample_size, allocation_ratio)
             
-            # Update for ARPU context
-            conversion_results['test_type'] = 'arpu'
-            conversion_results['control_arpu'] = control_arpu
-            conversion_results['treatment_arpu'] = treatment_arpu
-            conversion_results['price'] = price
+            return {
+                'test_type': 'arpu',
+                'control_rate': control_rate,
+                'treatment_rate': treatment_rate,
+                'lift_percentage': lift_percentage,
+                'sample_size': sample_size,
+                'power': power,
+                'effect_size': effect_size,
+                'standard_error': se,
+                'control_arpu': control_arpu,
+                'treatment_arpu': treatment_arpu,
+                'price': price
+            }
+    
+    @staticmethod
+    def _core(control_rate, lift_percentage):
+        """
+        Treatment rate, pooled variance and effect size shared by the sample size and power formulas
+        
+        Works element-wise on NumPy arrays as well as on scalars.
+        
+        Args:
+            control_rate (float): Baseline conversion rate
+            lift_percentage (float): Expected lift as percentage
             
-            return conversion_results
+        Returns:
+            tuple: (treatment_rate, pooled_variance, effect_size)
+        """
+        treatment_rate = control_rate * (1 + lift_percentage)
+        effect_size = treatment_rate - control_rate
+        pooled_rate = (control_rate + treatment_rate) * 0.5
+        pooled_variance = pooled_rate * (1 - pooled_rate)
+        return treatment_rate, pooled_variance, effect_size
+    
+    def _power(self,
+               pooled_variance: float,
+               effect_size: float,
+               sample_size: int,
+               allocation_ratio: float) -> tuple:
+        """
+        Calculate statistical power of a two-proportion z-test
+        
+        Args:
+            pooled_variance (float): Pooled variance of the two conversion rates
+            effect_size (float): Difference between treatment and control rates
+            sample_size (int): Total sample size
+            allocation_ratio (float): Allocation ratio
+            
+        Returns:
+            tuple: (power, standard_error)
+        """
+        _, control_share = _allocation_factors(allocation_ratio)
+        
+        # Calculate standard error
+        n1 = int(sample_size * control_share)
+        n2 = sample_size - n1
+        se = math.sqrt(pooled_variance * (1/n1 + 1/n2))
+        
+        # Calculate z-score for power
+        z_power = (effect_size / se) - self.z_alpha
+        
+        # Calculate power
+        power = _phi(z_power)
+        
+        return power, se
     
     def create_sample_size_table(self, 
                                 test_type: str,
@@ -239,19 +492,75 @@ class SampleSizeCalculator:
         Returns:
             dict: Table of results
         """
-        results = []
-        
-        for lift in lifts:
-            if test_type == 'conversion_rate':
-                result = self.calculate_conversion_rate_sample_size(
-                    control_value, lift, allocation_ratio
-                )
-            else:  # arpu
-                result = self.calculate_arpu_sample_size(
-                    control_value, lift, price, allocation_ratio
-                )
-            
-            results.append(result)
+        import numpy as np
+        
+        if test_type == 'arpu' and price is None:
+            raise ValueError("Price must be positive")
+        
+        # Validating the smallest lift covers all of them
+        lifts_arr = np.asarray(lifts, dtype=np.float64)
+        self._validate(control_value, lifts_arr.min(initial=np.inf), allocation_ratio,
+                       price if test_type == 'arpu' else None)
+        control_rate = control_value / price if test_type == 'arpu' else control_value
+        
+        allocation_factor, control_share = _allocation_factors(allocation_ratio)
+        
+        # Sample sizes for all lifts at once (same formula as calculate_conversion_rate_sample_size)
+        treatment_rate, pooled_variance, effect_size = self._core(control_rate, lifts_arr)
+        numerator = (self.z_alpha_plus_beta ** 2) * pooled_variance * allocation_factor
+        denominator = effect_size ** 2
+        total_sample_size = np.ceil(numerator / denominator).astype(np.int64)
+        
+        control_size = (total_sample_size * control_share).astype(np.int64)
+        treatment_size = total_sample_size - control_size
+        
+        # Table data as one array per field
+        columns = {
+            'lift_percentage': lifts_arr,
+            'treatment_rate': treatment_rate,
+            'total_sample_size': total_sample_size,
+            'control_size': control_size,
+            'treatment_size': treatment_size,
+            'expected_control_conversions': (control_size * control_rate).astype(np.int64),
+            'expected_treatment_conversions': (treatment_size * treatment_rate).astype(np.int64),
+            'minimum_detectable_effect': effect_size
+        }
+        if test_type == 'arpu':
+            columns['treatment_arpu'] = control_value * (1 + lifts_arr)
+            columns['treatment_conversion_rate'] = columns['treatment_arpu'] / price
+        
+        # Per-lift result dicts, same layout as calculate_*_sample_size
+        rows = [
+            {
+                'test_type': test_type,
+                'control_rate': control_rate,
+                'treatment_rate': rate,
+                'lift_percentage': lift,
+                'confidence_level': self.confidence_level,
+                'power': self.power,
+                'allocation_ratio': allocation_ratio,
+                'total_sample_size': total,
+                'control_size': control,
+                'treatment_size': treatment,
+                'expected_control_conversions': expected_control,
+                'expected_treatment_conversions': expected_treatment,
+                'minimum_detectable_effect': effect
+            }
+            for rate, lift, total, control, treatment, expected_control, expected_treatment, effect in zip(
+                *(columns[name].tolist() for name in (
+                    'treatment_rate', 'lift_percentage', 'total_sample_size', 'control_size', 'treatment_size',
+                    'expected_control_conversions', 'expected_treatment_conversions', 'minimum_detectable_effect'
+                ))
+            )
+        ]
+        if test_type == 'arpu':
+            for row, treatment_arpu, treatment_conversion_rate in zip(
+                    rows, columns['treatment_arpu'].tolist(), columns['treatment_conversion_rate'].tolist()):
+                row['control_arpu'] = control_value
+                row['treatment_arpu'] = treatment_arpu
+                row['price'] = price
+                row['control_conversion_rate'] = control_rate
+                row['treatment_conversion_rate'] = treatment_conversion_rate
         
         return {
             'test_type': test_type,
@@ -261,25 +570,61 @@ class SampleSizeCalculator:
             'power': self.power,
             'allocation_ratio': allocation_ratio,
             'price': price,
-            'results': results
+            'results': rows
         }
     
+    def grid(self,
+             control_rates: list,
+             lifts: list,
+             allocation_ratio: float = 0.5) -> np.ndarray:
+        """
+        Calculate total sample sizes for a grid of control rates and lifts
+        
+        Args:
+            control_rates (list): Baseline conversion rates (e.g., [0.01, 0.02, 0.05])
+            lifts (list): Expected lifts as percentages (e.g., [0.10, 0.20])
+            allocation_ratio (float): Ratio of users in treatment group
+            
+        Returns:
+            np.ndarray: Total sample sizes, one row per control rate and one column per lift
+        """
+        import numpy as np
+        
+        control_rates = np.asarray(control_rates, dtype=np.float64)
+        lifts = np.asarray(lifts, dtype=np.float64)
+        
+        if np.any((control_rates <= 0) | (control_rates >= 1)):
+            raise ValueError("Control rate must be between 0 and 1")
+        
+        if np.any(lifts <= 0):
+            raise ValueError("Lift percentage must be positive")
+        
+        if not (0 < allocation_ratio < 1):
+            raise ValueError("Allocation ratio must be between 0 and 1")
+        
+        return _ss_grid(control_rates, lifts, self.z_alpha_plus_beta ** 2, allocation_ratio)
+    
     def save_results(self, results: dict, output_file: str):
         """Save results to JSON file"""
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                                     default=_json_default))
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(results, f, indent=2, default=_json_default)
         print(f"Results saved to: {output_file}")
     
     def print_results(self, results: dict):
         """Print results in a formatted way"""
         if 'results' in results:  # Table results
             self._print_table_results(results)
-        elif 'test_type' in results and results['test_type'] == 'conversion_rate':
+        elif 'sample_size' in results:  # Power analysis results
+            self._print_power_results(results)
+        elif results['test_type'] == 'conversion_rate':
             self._print_conversion_rate_results(results)
-        elif 'test_type' in results and results['test_type'] == 'arpu':
-            self._print_arpu_results(results)
         else:
-            self._print_power_results(results)
+            self._print_arpu_results(results)
     
     def _print_conversion_rate_results(self, results: dict):
         """Print conversion rate sample size results"""
@@ -326,38 +671,36 @@ class SampleSizeCalculator:
     def _print_table_results(self, results: dict):
         """Print table results"""
         test_type = results['test_type']
-        print(f"\n{test_type.upper()} Sample Size Table")
-        print(f"=" * 60)
+        rows = results['results']
+        
+        def table_columns(treatment_column):
+            return [[row[name] for row in rows] for name in
+                    ('lift_percentage', treatment_column, 'total_sample_size', 'control_size', 'treatment_size')]
+        
+        # Format the whole table into one buffer and write it at once
+        buf = [f"\n{test_type.upper()} Sample Size Table", "=" * 60]
         
         if test_type == 'conversion_rate':
-            print(f"Control Rate: {results['control_value']:.3f} ({results['control_value']*100:.1f}%)")
-            print(f"Confidence Level: {results['confidence_level']*100:.0f}% | Power: {results['power']*100:.0f}%")
-            print(f"\n{'Lift %':<10} {'Treatment Rate':<15} {'Total Sample':<15} {'Control':<12} {'Treatment':<12}")
-            print("-" * 70)
-            
-            for result in results['results']:
-                lift_pct = result['lift_percentage'] * 100
-                treatment_rate = result['treatment_rate']
-                total = result['total_sample_size']
-                control = result['control_size']
-                treatment = result['treatment_size']
-                
-                print(f"{lift_pct:>6.1f}%{'':<3} {treatment_rate:<15.3f} {total:<15,} {control:<12,} {treatment:<12,}")
+            buf.append(f"Control Rate: {results['control_value']:.3f} ({results['control_value']*100:.1f}%)")
+            buf.append(f"Confidence Level: {results['confidence_level']*100:.0f}% | Power: {results['power']*100:.0f}%")
+            buf.append(f"\n{'Lift %':<10} {'Treatment Rate':<15} {'Total Sample':<15} {'Control':<12} {'Treatment':<12}")
+            buf.append("-" * 70)
+            buf.extend(
+                f"{lift*100:>6.1f}%{'':<3} {treatment_rate:<15.3f} {total:<15,} {control:<12,} {treatment:<12,}"
+                for lift, treatment_rate, total, control, treatment in zip(*table_columns('treatment_rate'))
+            )
         
         else:  # arpu
-            print(f"Control ARPU: ${results['control_value']:.2f} | Price: ${results['price']:.2f}")
-            print(f"Confidence Level: {results['confidence_level']*100:.0f}% | Power: {results['power']*100:.0f}%")
-            print(f"\n{'Lift %':<10} {'Treatment ARPU':<15} {'Total Sample':<15} {'Control':<12} {'Treatment':<12}")
-            print("-" * 70)
-            
-            for result in results['results']:
-                lift_pct = result['lift_percentage'] * 100
-                treatment_arpu = result['treatment_arpu']
-                total = result['total_sample_size']
-                control = result['control_size']
-                treatment = result['treatment_size']
-                
-                print(f"{lift_pct:>6.1f}%{'':<3} ${treatment_arpu:<14.2f} {total:<15,} {control:<12,} {treatment:<12,}")
+            buf.append(f"Control ARPU: ${results['control_value']:.2f} | Price: ${results['price']:.2f}")
+            buf.append(f"Confidence Level: {results['confidence_level']*100:.0f}% | Power: {results['power']*100:.0f}%")
+            buf.append(f"\n{'Lift %':<10} {'Treatment ARPU':<15} {'Total Sample':<15} {'Control':<12} {'Treatment':<12}")
+            buf.append("-" * 70)
+            buf.extend(
+                f"{lift*100:>6.1f}%{'':<3} ${treatment_arpu:<14.2f} {total:<15,} {control:<12,} {treatment:<12,}"
+                for lift, treatment_arpu, total, control, treatment in zip(*table_columns('treatment_arpu'))
+            )
+        
+        sys.stdout.write("\n".join(buf) + "\n")
     
     def _print_power_results(self, results: dict):
         """Print power analysis results"""
@@ -0,0 +1,77 @@
+import json
+import math
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ab_testing_analyzer import calculate_group_stats, compare_groups_arpu, load_data_from_json
+
+
+class TestAllUsersConvert(unittest.TestCase):
+    """A group where every user converts at the same price has zero revenue variance"""
+
+    def test_aggregated_group_has_zero_variance(self):
+        data = {
+            'analysis_type': 'arpu',
+            'groups': [{'name': 'All', 'users': 5, 'total_revenue': 199.95, 'conversion_count': 5}]
+        }
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(data, f)
+        try:
+            groups, _, _, _ = load_data_from_json(f.name)
+        finally:
+            os.unlink(f.name)
+
+        users, conversions = groups[0]
+        stats = calculate_group_stats(users, conversions)
+        self.assertEqual(stats['revenue_variance'], 0.0)
+        self.assertEqual(stats['se'], 0.0)
+
+    def test_uniform_price_list_variance_is_not_negative(self):
+        for n in range(2, 50):
+            stats = calculate_group_stats(n, [39.99] * n)
+            self.assertGreaterEqual(stats['revenue_variance'], 0.0)
+            self.assertFalse(math.isnan(stats['se']))
+
+    def test_comparison_against_all_converting_group_is_significant(self):
+        groups = [
+            (5, {'n': 5, 's': 199.95, 'ss': 199.95 * 39.99}),
+            (1000, [39.99] * 50),
+        ]
+        _, comparisons = compare_groups_arpu(groups)
+        row = comparisons.iloc[0]
+        self.assertFalse(math.isnan(row['SE Difference']))
+        self.assertGreater(row['Z-score'], 0)
+        self.assertTrue(row['Significant'])
+
+
+
+class TestMoreConversionsThanUsers(unittest.TestCase):
+    """Revenue data with more conversions than users is rejected instead of giving a NaN standard error"""
+
+    def _load(self, group):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'analysis_type': 'arpu', 'groups': [group]}, f)
+        try:
+            return load_data_from_json(f.name)
+        finally:
+            os.unlink(f.name)
+
+    def test_price_counts_format(self):
+        with self.assertRaisesRegex(ValueError, 'cannot exceed users'):
+            self._load({'users': 5, 'price_counts': [{'price': 9.99, 'count': 10}]})
+
+    def test_aggregated_format(self):
+        with self.assertRaisesRegex(ValueError, 'cannot exceed users'):
+            self._load({'users': 5, 'total_revenue': 99.9, 'conversion_count': 10})
+
+    def test_group_stats(self):
+        with self.assertRaisesRegex(ValueError, 'cannot exceed users'):
+            calculate_group_stats(5, [9.99] * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sample_size_calculator
+from sample_size_calculator import SampleSizeCalculator, make_calculator
+
+CONTROL_RATES = [0.001, 0.02, 0.05, 0.3, 0.75]
+LIFTS = [0.01, 0.1, 0.2, 0.5, 1.5]
+SETTINGS = [(0.95, 0.80, 0.5), (0.90, 0.90, 0.3), (0.975, 0.85, 0.62)]
+
+
+class TestGrid(unittest.TestCase):
+    """SampleSizeCalculator.grid agrees with the single-calculation method on every path"""
+
+    def _expected(self, calculator, allocation_ratio):
+        return np.array([
+            [calculator.calculate_conversion_rate_sample_size(rate, lift, allocation_ratio)['total_sample_size']
+             for lift in LIFTS]
+            for rate in CONTROL_RATES
+        ])
+
+    def test_numpy_path_matches_scalar(self):
+        for confidence_level, power, allocation_ratio in SETTINGS:
+            calculator = SampleSizeCalculator(confidence_level, power)
+            with mock.patch.object(sample_size_calculator, 'NUMBA_MIN_GRID_CELLS', float('inf')):
+                grid = calculator.grid(CONTROL_RATES, LIFTS, allocation_ratio)
+            np.testing.assert_array_equal(grid, self._expected(calculator, allocation_ratio))
+
+    @unittest.skipUnless(importlib.util.find_spec('numba'), 'numba is not installed')
+    def test_numba_path_matches_numpy_and_scalar(self):
+        for confidence_level, power, allocation_ratio in SETTINGS:
+            calculator = SampleSizeCalculator(confidence_level, power)
+            with mock.patch.object(sample_size_calculator, 'NUMBA_MIN_GRID_CELLS', 0):
+                numba_grid = calculator.grid(CONTROL_RATES, LIFTS, allocation_ratio)
+            with mock.patch.object(sample_size_calculator, 'NUMBA_MIN_GRID_CELLS', float('inf')):
+                numpy_grid = calculator.grid(CONTROL_RATES, LIFTS, allocation_ratio)
+            np.testing.assert_array_equal(numba_grid, numpy_grid)
+            np.testing.assert_array_equal(numba_grid, self._expected(calculator, allocation_ratio))
+
+    def test_empty_inputs(self):
+        calculator = SampleSizeCalculator()
+        self.assertEqual(calculator.grid([], LIFTS).shape, (0, len(LIFTS)))
+        self.assertEqual(calculator.grid(CONTROL_RATES, []).shape, (len(CONTROL_RATES), 0))
+        self.assertEqual(calculator.grid([], []).shape, (0, 0))
+
+
+class TestMakeCalculator(unittest.TestCase):
+    """make_calculator gives the same totals as SampleSizeCalculator"""
+
+    def test_matches_calculator(self):
+        for confidence_level, power, allocation_ratio in SETTINGS:
+            calculator = SampleSizeCalculator(confidence_level, power)
+            calculate = make_calculator(confidence_level, power, allocation_ratio)
+            for rate in CONTROL_RATES:
+                for lift in LIFTS:
+                    expected = calculator.calculate_conversion_rate_sample_size(rate, lift, allocation_ratio)
+                    self.assertEqual(calculate(rate, lift), expected['total_sample_size'])
+
+
+class TestSampleSizeTable(unittest.TestCase):
+    """create_sample_size_table rows match the single calculations and print from plain lists"""
+
+    def test_rows_match_single_calculations(self):
+        calculator = SampleSizeCalculator(0.99, 0.90)
+        table = calculator.create_sample_size_table('conversion_rate', 0.03, LIFTS, 0.3)
+        for lift, row in zip(LIFTS, table['results']):
+            self.assertEqual(row, calculator.calculate_conversion_rate_sample_size(0.03, lift, 0.3))
+
+        table = calculator.create_sample_size_table('arpu', 0.5, LIFTS, 0.4, 4.99)
+        for lift, row in zip(LIFTS, table['results']):
+            self.assertEqual(row, calculator.calculate_arpu_sample_size(0.5, lift, 4.99, 0.4))
+
+    def test_prints_table_loaded_from_json(self):
+        calculator = SampleSizeCalculator()
+        table = calculator.create_sample_size_table('arpu', 0.2, LIFTS, 0.5, 9.99)
+        loaded = json.loads(json.dumps(table))
+
+        printed = []
+        for results in (table, loaded):
+            buffer = io.StringIO()
+            with contextlib.redirect_stdout(buffer):
+                calculator.print_results(results)
+            printed.append(buffer.getvalue())
+        self.assertEqual(printed[0], printed[1])
+
+
+if __name__ == '__main__':
+    unittest.main()